@@ -16,6 +16,8 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import calendar 
+from curvas_duracion import GRILLA_EXCEDENCIA, curva_duracion_grilla, curvas_por_decada
+from reportes import ResumenEstacion, escribir_reporte, nombre_reporte
 
 #----------------------------------
 #       MÓDULO DE ENTRADA
@@ -178,11 +180,11 @@ def indicadores_hidrologicos(alturas_masked, fechas_array):
     
     df = df.dropna()
 
-    # Percentiles importantes
+    # Percentiles importantes (de no excedencia)
     q10 = df['caudal'].quantile(0.10)
     q50 = df['caudal'].quantile(0.50)
     q90 = df['caudal'].quantile(0.90)
-    q95 = df['caudal'].quantile(0.05)
+    q95 = df['caudal'].quantile(0.95)
     
     # Coeficiente de variación
     coef_var = df['caudal'].std() / df['caudal'].mean()
@@ -196,13 +198,21 @@ def indicadores_hidrologicos(alturas_masked, fechas_array):
 
 # >>>>>> CURVA DE DURACIÓN <<<<<<
 
-def curva_duracion(alturas_masked):
+def curva_duracion(alturas_masked, excedencia=GRILLA_EXCEDENCIA):
     
-    datos = alturas_masked.compressed()  # elimina valores enmascarados
-    datos_ordenados = np.sort(datos)[::-1]
-    prob_excedencia = np.arange(1, len(datos_ordenados)+1) / len(datos_ordenados) * 100
+    """
+    Calcula la curva de duración de caudales sobre una grilla fija de probabilidades de
+    excedencia (ver curvas_duracion.py), sin ordenar ni devolver la serie completa.
+    Parámetros:
+        alturas_masked: array de caudales (masked array).
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        caudales: caudal correspondiente a cada probabilidad de excedencia.
+        prob_excedencia: probabilidades de excedencia (%).
+    """
+    caudales = curva_duracion_grilla(alturas_masked, excedencia)
     
-    return datos_ordenados, prob_excedencia
+    return caudales, np.asarray(excedencia)
 
 
 
@@ -218,36 +228,16 @@ def curva_duracion(alturas_masked):
 
 #Definimos una función para guardar los resultados.
 
-def resultados_txt(longitud, fecha_inicial, fecha_final, datos_obs, datos_faltantes,
-                   valor_medio, desviacion, valor_maximo, valor_minimo, q10, q50, q90, q95, coef_var, stid):
+def resultados_txt(resumen):
     """
-    Guarda resultados en un archivo .txt
+    Guarda resultados en un archivo .txt (ver reportes.py para otros formatos).
     Parámetros:
-        longitud, fecha_inicial, fecha_final, datos_obs, datos_faltantes,
-        valor_medio, desviacion, valor_maximo, valor_minimo, stid.
+        resumen (ResumenEstacion): resultados de la estación.
     Retorna: 
         Como salida genera un archivo .txt
     """
-    nombre_archivo = f"resultados_{stid}.txt"
-    with open(nombre_archivo, "w", encoding="utf-8") as archivo:
-        archivo.write(f"Resultados de la estación: {stid}\n")
-        archivo.write("====================================\n")
-        archivo.write(f"Longitud de la serie temporal:{longitud}\n")
-        archivo.write(f"Período de datos: {fecha_inicial} a {fecha_final}\n")
-        archivo.write(f"Datos observados: {datos_obs}\n")
-        archivo.write(f"Datos faltantes: {datos_faltantes}\n")
-        archivo.write(f"Media: {round(valor_medio,2)} m³/s\n")
-        archivo.write(f"Valor máximo: {round(valor_maximo,2)} m³/s\n")
-        archivo.write(f"Valor mínimo: {round(valor_minimo,2)} m³/s\n")
-        archivo.write(f"Desviación estándar: {round(desviacion,2)} m³/s\n")
-        archivo.write("\nINDICADORES HIDROLÓGICOS\n")
-        archivo.write("====================================\n")
-        archivo.write(f"Q10: {round(q10,2)} m³/s\n")
-        archivo.write(f"Q50 (mediana): {round(q50,2)} m³/s\n")
-        archivo.write(f"Q90: {round(q90,2)} m³/s\n")
-        archivo.write(f"Q95 (caudal ecológico): {round(q95,2)} m³/s\n")
-        archivo.write(f"Coeficiente de variación: {round(coef_var,3)}\n")
-    print(f"Archivo 'resultados_{stid}.txt' guardado correctamente.")
+    escribir_reporte(resumen, formato="txt")
+    print(f"Archivo '{nombre_reporte(resumen)}' guardado correctamente.")
     
 
 
@@ -350,6 +340,21 @@ def graficos(fechas_array, alturas_masked, stid):
     plt.tight_layout()
     plt.show()
 
+    # Curvas de duración por década
+    decadas, curvas = curvas_por_decada(fechas_array, alturas_masked)
+
+    plt.figure(figsize=(8,5))
+    for decada, curva in zip(decadas, curvas):
+        plt.plot(GRILLA_EXCEDENCIA, curva, label=f"{decada}s")
+    plt.grid(True, which='both', linestyle='--', alpha=0.5)
+    plt.xlabel("Probabilidad de excedencia (%)")
+    plt.ylabel("Caudal (m³/s)")
+    plt.title(f"Curvas de duración por década: {stid}")
+    plt.legend()
+    plt.gca().invert_xaxis()
+    plt.tight_layout()
+    plt.show()
+
 #-------------------------------------------
 #        PROGRAMA PRINCIPAL 
 #-------------------------------------------
@@ -373,7 +378,7 @@ def analisis_hidrometrico_completo(nombre_archivo, stid):
         La función no retorna valores directamente. 
         Como salida genera:
         > un archivo de texto con los resultados estadísticos.
-        > gráficos de la serie temporal, ciclo anual y serie interpolada.
+        > gráficos de la serie temporal, ciclo anual, serie interpolada y curvas de duración.
         
         """
     
@@ -387,13 +392,18 @@ def analisis_hidrometrico_completo(nombre_archivo, stid):
     longitud, fecha_inicial, fecha_final, datos_faltantes, datos_obs = observaciones(fechas_array, alturas_masked)
     valor_medio, valor_maximo, valor_minimo, desviacion, mes_max, mes_min = estadisticas(alturas_masked, fechas_array)
     q10, q50, q90, q95, coef_var, maximos_anuales = indicadores_hidrologicos(alturas_masked, fechas_array)
+    caudal_ecologico, _ = curva_duracion(alturas_masked, [95])
      
-   
+    resumen = ResumenEstacion(estacion=stid, longitud=longitud,
+                              fecha_inicial=fecha_inicial, fecha_final=fecha_final,
+                              datos_observados=datos_obs, datos_faltantes=datos_faltantes,
+                              media=valor_medio, maximo=valor_maximo, minimo=valor_minimo,
+                              desviacion=desviacion, q10=q10, q50=q50, q90=q90, q95=q95,
+                              caudal_ecologico=caudal_ecologico[0], coef_var=coef_var)
     
     #Módulo de salida
     
-    resultados_txt(longitud, fecha_inicial, fecha_final, datos_obs, datos_faltantes,
-                   valor_medio, desviacion, valor_maximo, valor_minimo, q10, q50, q90, q95, coef_var, stid)
+    resultados_txt(resumen)
     graficos(fechas_array, alturas_masked, stid)
 
 
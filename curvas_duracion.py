@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE CURVAS DE DURACIÓN DE CAUDALES
+
+Evalúa las curvas de duración sobre una grilla fija de probabilidades de excedencia, de modo
+que el tamaño del resultado no depende de la longitud de la serie. Permite calcular la curva
+del período de registro, por mes y por década, y comparar muchas estaciones a la vez en una
+matriz estaciones x grilla con una sola llamada vectorizada.
+
+Los cuantiles se interpolan linealmente entre estadísticos de orden (igual que np.quantile).
+Las series se copian a una matriz estaciones x días rellena con NaN y se ordenan todas juntas
+con un único np.sort (o np.partition si la grilla necesita pocos estadísticos de orden).
+"""
+#===================================================
+#    MOTOR DE CURVAS DE DURACIÓN
+#===================================================
+
+
+import time
+
+import numpy as np
+
+
+# Grilla de probabilidades de excedencia por defecto (%), cada 0.5 %.
+GRILLA_EXCEDENCIA = np.linspace(0, 100, 201)
+
+# Cantidad máxima de estadísticos de orden para usar np.partition en lugar de np.sort.
+MAX_INDICES_PARTICION = 32
+
+
+#--------------------------------
+#     FUNCIONES AUXILIARES
+#--------------------------------
+
+#>>>>>> MATRIZ DE SERIES <<<<<<
+
+# Las series de distintas estaciones tienen longitudes y datos faltantes distintos. Las copiamos
+# a una matriz rectangular con NaN en los faltantes y en el relleno: numpy ordena los NaN al
+# final, así que después de ordenar cada fila tiene sus n datos válidos en las primeras columnas.
+
+def _matriz_nan(series):
+
+    """
+    Parámetros:
+        series: array 2D estaciones x días o lista de arrays 1D (masked o con NaN).
+    Retorna:
+        matriz (float) estaciones x días máximo, con NaN en faltantes y relleno.
+    """
+    if isinstance(series, np.ndarray) and series.ndim == 2:
+        # np.where devuelve una copia: la matriz se ordena en su lugar sin tocar la original.
+        series = np.ma.asarray(series, dtype=float)
+        return np.where(np.ma.getmaskarray(series), np.nan, series.data)
+    series = [np.ma.asarray(serie, dtype=float) for serie in series]
+    largo = max((len(serie) for serie in series), default=0)
+    matriz = np.empty((len(series), max(largo, 1)))
+    for fila, serie in zip(matriz, series):
+        # Copiamos los datos y marcamos enmascarados y relleno sin crear copias intermedias.
+        destino = fila[:len(serie)]
+        np.copyto(destino, serie.data)
+        np.copyto(destino, np.nan, where=np.ma.getmaskarray(serie))
+        fila[len(serie):] = np.nan
+    return matriz
+
+
+#>>>>>> CUANTILES POR FILA <<<<<<
+
+def _cuantiles_filas(matriz, excedencia):
+
+    """
+    Calcula, para cada fila, los caudales correspondientes a la grilla de excedencia.
+    Parámetros:
+        matriz: matriz estaciones x días con NaN en los faltantes (se reordena en su lugar).
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        matriz (filas x grilla) de caudales; NaN en filas sin datos.
+    """
+    n = (~np.isnan(matriz)).sum(axis=1)
+    no_excedencia = 1 - np.asarray(excedencia, dtype=float) / 100
+    posicion = no_excedencia[None, :] * np.maximum(n - 1, 0)[:, None]
+    bajo = np.floor(posicion).astype(int)
+    alto = np.minimum(bajo + 1, np.maximum(n - 1, 0)[:, None])
+    fraccion = posicion - bajo
+
+    # np.partition sólo ubica los estadísticos de orden que usamos, pero su costo crece con
+    # la cantidad de índices: a partir de unas decenas el ordenamiento de numpy es más rápido.
+    indices = np.unique(np.concatenate([bajo.ravel(), alto.ravel()]))
+    if len(indices) <= MAX_INDICES_PARTICION:
+        matriz.partition(indices, axis=1)
+    else:
+        matriz.sort(axis=1)
+
+    valor_bajo = np.take_along_axis(matriz, bajo, axis=1)
+    valor_alto = np.take_along_axis(matriz, alto, axis=1)
+    caudales = valor_bajo + fraccion * (valor_alto - valor_bajo)
+    caudales[n == 0] = np.nan
+    return caudales
+
+
+#--------------------------------
+#     CURVAS DE DURACIÓN
+#--------------------------------
+
+#>>>>>> VARIAS ESTACIONES <<<<<<
+
+def matriz_curvas(series, excedencia=GRILLA_EXCEDENCIA):
+
+    """
+    Calcula las curvas de duración de muchas estaciones en una sola llamada.
+    Parámetros:
+        series: lista de arrays 1D (masked arrays o con NaN en los faltantes), de cualquier
+                longitud, o un array 2D estaciones x días.
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        matriz (estaciones x grilla) de caudales.
+    """
+    return _cuantiles_filas(_matriz_nan(series), excedencia)
+
+
+#>>>>>> PERÍODO DE REGISTRO <<<<<<
+
+def curva_duracion_grilla(caudales, excedencia=GRILLA_EXCEDENCIA):
+
+    """
+    Curva de duración de una serie para todo el período de registro.
+    Parámetros:
+        caudales: masked array de caudales.
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        array de caudales, uno por punto de la grilla.
+    """
+    return matriz_curvas([caudales], excedencia)[0]
+
+
+#>>>>>> POR GRUPOS (MES, DÉCADA, ...) <<<<<<
+
+def curvas_por_grupo(claves, caudales, excedencia=GRILLA_EXCEDENCIA):
+
+    """
+    Calcula una curva de duración por cada valor distinto de `claves`.
+    Parámetros:
+        claves: array de enteros con el grupo de cada dato (mes, década, etc.).
+        caudales: masked array de caudales.
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        grupos: array con los grupos que tienen datos válidos, ordenados.
+        matriz (grupos x grilla) de caudales.
+    """
+    caudales = np.ma.asarray(caudales, dtype=float)
+    validos = ~np.ma.getmaskarray(caudales) & ~np.isnan(caudales.data)
+    claves = np.asarray(claves)[validos]
+    valores = caudales.data[validos]
+
+    if len(claves) == 0:
+        return claves, np.empty((0, len(excedencia)))
+
+    orden = np.argsort(claves, kind="stable")
+    grupos, inicios, cantidad = np.unique(claves[orden], return_index=True, return_counts=True)
+    fila = np.repeat(np.arange(len(grupos)), cantidad)
+    columna = np.arange(len(valores)) - np.repeat(inicios, cantidad)
+    matriz = np.full((len(grupos), cantidad.max()), np.nan)
+    matriz[fila, columna] = valores[orden]
+    return grupos, _cuantiles_filas(matriz, excedencia)
+
+
+def _fechas_numpy(fechas_array):
+    return np.asarray(fechas_array, dtype="datetime64[D]")
+
+
+def curvas_por_mes(fechas_array, caudales, excedencia=GRILLA_EXCEDENCIA):
+
+    """
+    Curvas de duración de cada mes del año.
+    Parámetros:
+        fechas_array: array de fechas (datetime.date).
+        caudales: masked array de caudales.
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        matriz (12 x grilla); la fila 0 es enero. Meses sin datos quedan en NaN.
+    """
+    meses = _fechas_numpy(fechas_array).astype("datetime64[M]").astype(int) % 12 + 1
+    grupos, curvas = curvas_por_grupo(meses, caudales, excedencia)
+    matriz = np.full((12, len(excedencia)), np.nan)
+    matriz[grupos - 1] = curvas
+    return matriz
+
+
+def curvas_por_decada(fechas_array, caudales, excedencia=GRILLA_EXCEDENCIA):
+
+    """
+    Curvas de duración de cada década con datos (1990, 2000, ...).
+    Parámetros:
+        fechas_array: array de fechas (datetime.date).
+        caudales: masked array de caudales.
+        excedencia: probabilidades de excedencia (%).
+    Retorna:
+        decadas: array con el primer año de cada década.
+        matriz (décadas x grilla) de caudales.
+    """
+    anios = _fechas_numpy(fechas_array).astype("datetime64[Y]").astype(int) + 1970
+    return curvas_por_grupo(anios // 10 * 10, caudales, excedencia)
+
+
+#----------------------------------
+#     BENCHMARK DE RENDIMIENTO
+#----------------------------------
+
+def _mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return round(min(tiempos), 3)
+
+
+def benchmark_curvas(estaciones=200, anios=100, repeticiones=3, semilla=0):
+
+    """
+    Compara varias formas de obtener las curvas de muchas estaciones:
+        > estación por estación, ordenando cada serie completa (como hacía curva_duracion),
+        > np.nanquantile sobre la matriz estaciones x días,
+        > matriz_curvas con una lista de masked arrays y con la matriz estaciones x días,
+        > matriz_curvas con la grilla corta de los indicadores (usa np.partition).
+    Se informa el mejor tiempo de `repeticiones` corridas.
+    Retorna:
+        dict con los tiempos en segundos y la forma de la matriz resultante.
+    """
+    generador = np.random.default_rng(semilla)
+    dias = anios * 365
+    datos = generador.lognormal(4, 1, (estaciones, dias))
+    datos[generador.random((estaciones, dias)) < 0.05] = np.nan
+    series = [np.ma.masked_invalid(fila) for fila in datos]
+
+    def ordenando_cada_serie():
+        for serie in series:
+            ordenados = np.sort(serie.compressed())[::-1]
+            prob = np.arange(1, len(ordenados) + 1) / len(ordenados) * 100
+            np.interp(GRILLA_EXCEDENCIA, prob, ordenados)
+
+    return {"estaciones": estaciones, "anios": anios,
+            "ordenando_cada_serie_s": _mejor_tiempo(ordenando_cada_serie, repeticiones),
+            "nanquantile_s": _mejor_tiempo(lambda: np.nanquantile(datos, 1 - GRILLA_EXCEDENCIA / 100, axis=1), repeticiones),
+            "matriz_curvas_lista_s": _mejor_tiempo(lambda: matriz_curvas(series), repeticiones),
+            "matriz_curvas_matriz_s": _mejor_tiempo(lambda: matriz_curvas(datos), repeticiones),
+            "matriz_curvas_grilla_corta_s": _mejor_tiempo(lambda: matriz_curvas(datos, [5, 10, 50, 90, 95]), repeticiones),
+            "forma_resultado": matriz_curvas(series).shape}
+
+
+if __name__ == "__main__":
+    print(benchmark_curvas())
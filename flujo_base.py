@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+SEPARACIÓN DE FLUJO BASE
+
+Separa el caudal diario en flujo base y escurrimiento rápido con filtros digitales
+recursivos y calcula el índice de flujo base (BFI) por año y por estación:
+    > Lyne-Hollick (con varias pasadas adelante/atrás).
+    > Eckhardt (dos parámetros).
+    > Chapman-Maxwell.
+
+Los filtros son recursiones con restricciones (el flujo base no puede superar al caudal),
+por lo que no se pueden escribir como un único filtro lineal. Se implementan sobre una matriz
+días x estaciones: el bucle recorre los días una sola vez y en cada paso actualiza todas las
+estaciones con operaciones de numpy. Con pocas estaciones (por ejemplo una sola serie) el
+costo fijo de cada llamada a numpy domina, y se usa un bucle sobre números de Python por
+estación (ver MIN_ESTACIONES_VECTORIZADO). Los filtros necesitan la serie completa, por eso se
+aplican sobre la serie rellenada (ver rellenar_serie).
+
+Uso:
+    python flujo_base.py     # benchmark contra un bucle de Python
+"""
+#===================================================
+#    SEPARACIÓN DE FLUJO BASE
+#===================================================
+
+
+import time
+
+import numpy as np
+
+
+FILTROS = ("lyne_hollick", "eckhardt", "chapman_maxwell")
+
+# Cantidad mínima de estaciones para recorrer los días actualizando todas las estaciones con
+# numpy; con menos, cada estación se filtra con un bucle sobre números de Python.
+MIN_ESTACIONES_VECTORIZADO = 12
+
+
+#----------------------------------
+#       RELLENO DE LA SERIE
+#----------------------------------
+
+def rellenar_serie(fechas_array, caudales, max_interpolacion=7):
+
+    """
+    Rellena los datos faltantes de la serie. Los huecos cortos se interpolan linealmente
+    entre los datos vecinos; los más largos se rellenan, como en graficos(), con el caudal
+    medio del mes correspondiente.
+    Parámetros:
+        fechas_array: array de fechas (datetime.date).
+        caudales: masked array de caudales.
+        max_interpolacion (int): largo máximo (días) de los huecos que se interpolan.
+                                 Con 0 se usa sólo la media mensual.
+    Retorna:
+        array (float) de caudales sin faltantes (NaN sólo si un mes no tiene ningún dato).
+    """
+    caudales = np.ma.asarray(caudales, dtype=float)
+    valores = caudales.filled(np.nan)
+    faltantes = np.isnan(valores)
+    if not faltantes.any():
+        return valores
+    validos = np.flatnonzero(~faltantes)
+    if len(validos) == 0:
+        return valores
+
+    # Largo del hueco al que pertenece cada faltante.
+    inicio = faltantes & ~np.concatenate([[False], faltantes[:-1]])
+    hueco = np.cumsum(inicio) * faltantes
+    largo_hueco = np.bincount(hueco)[hueco]
+
+    # Sólo se interpolan los huecos cortos que tienen datos a ambos lados.
+    posicion = np.arange(len(valores))
+    interior = (posicion > validos[0]) & (posicion < validos[-1])
+    interpolar = faltantes & interior & (largo_hueco <= max_interpolacion)
+    rellena = valores.copy()
+    rellena[interpolar] = np.interp(posicion[interpolar], validos, valores[validos])
+
+    meses = np.asarray(fechas_array, dtype="datetime64[D]").astype("datetime64[M]").astype(int) % 12
+    conteo = np.bincount(meses[validos], minlength=12)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media_mensual = np.bincount(meses[validos], weights=valores[validos], minlength=12) / conteo
+    resto = np.isnan(rellena)
+    rellena[resto] = media_mensual[meses[resto]]
+    return rellena
+
+
+#----------------------------------
+#        FILTROS RECURSIVOS
+#----------------------------------
+
+# Todos los filtros trabajan sobre una matriz días x estaciones, contigua por filas, para que
+# cada paso del bucle lea una fila de memoria continua. Un NaN corta la recursión: el filtro
+# vuelve a arrancar en el siguiente dato válido, lo que permite procesar juntas estaciones
+# con registros de distinta extensión.
+
+def _como_matriz(caudales):
+    caudales = np.asarray(caudales, dtype=float)
+    return np.ascontiguousarray(np.atleast_2d(caudales).T), caudales.ndim == 1
+
+
+def _como_salida(matriz, es_serie):
+    return matriz[:, 0].copy() if es_serie else np.ascontiguousarray(matriz.T)
+
+
+def _por_estacion(filtro, x, *parametros):
+    # Aplica un filtro escalar a cada columna (estación) de la matriz días x estaciones.
+    columnas = [filtro(columna, *parametros) for columna in x.T.tolist()]
+    return np.ascontiguousarray(np.array(columnas).reshape(x.shape[::-1]).T)
+
+
+def _filtro_lineal_serie(q, a, c):
+    # Misma recursión que _filtro_lineal sobre una lista de floats (con las mismas reglas
+    # para los NaN). "x < y" es falso si alguno es NaN: así se arranca con b = Q.
+    base = [q[0]]
+    anterior = q[0]
+    for valor in q[1:]:
+        candidato = a * anterior + c * valor
+        anterior = candidato if candidato < valor else valor
+        base.append(anterior)
+    return base
+
+
+def _filtro_lineal(q, a, c):
+
+    """
+    Recursión b_t = min(a b_{t-1} + c Q_t, Q_t), con b = Q al arrancar.
+    Es la forma común de los filtros de Eckhardt y de Chapman-Maxwell.
+    """
+    if q.shape[1] < MIN_ESTACIONES_VECTORIZADO:
+        return _por_estacion(_filtro_lineal_serie, q, a, c)
+    base = np.empty_like(q)
+    entrada = c * q
+    base[0] = q[0]
+    auxiliar = np.empty(q.shape[1])
+    for t in range(1, len(q)):
+        np.multiply(base[t - 1], a, out=auxiliar)
+        auxiliar += entrada[t]
+        # fmin ignora el NaN de "auxiliar" cuando el día anterior falta: arranca con b = Q.
+        np.fmin(auxiliar, q[t], out=base[t])
+    return base
+
+
+def _pasada_lyne_hollick_serie(x, alfa):
+    # Misma pasada que _pasada_lyne_hollick sobre una lista de floats; un NaN lleva el
+    # escurrimiento rápido a 0, como fmax en la versión vectorizada.
+    factor = (1 + alfa) / 2
+    base = [x[0]]
+    rapido = 0.0
+    for anterior, valor in zip(x, x[1:]):
+        rapido = alfa * rapido + factor * (valor - anterior)
+        if not rapido > 0.0:
+            rapido = 0.0
+        if rapido > valor:
+            rapido = valor
+        base.append(valor - rapido)
+    return base
+
+
+def _pasada_lyne_hollick(x, alfa):
+
+    """
+    Una pasada del filtro de Lyne-Hollick sobre x (días x estaciones):
+        qf_t = alfa qf_{t-1} + (1 + alfa) / 2 (x_t - x_{t-1}),  con 0 <= qf_t <= x_t.
+    Retorna el flujo base x - qf.
+    """
+    if x.shape[1] < MIN_ESTACIONES_VECTORIZADO:
+        return _por_estacion(_pasada_lyne_hollick_serie, x, alfa)
+    rapido = np.empty_like(x)
+    incremento = np.empty_like(x)
+    incremento[0] = np.nan
+    np.subtract(x[1:], x[:-1], out=incremento[1:])
+    incremento *= (1 + alfa) / 2
+    rapido[0] = 0.0
+    auxiliar = np.empty(x.shape[1])
+    for t in range(1, len(x)):
+        np.multiply(rapido[t - 1], alfa, out=auxiliar)
+        auxiliar += incremento[t]
+        # fmax lleva a 0 los valores negativos y también los NaN (arranque tras un faltante).
+        np.fmax(auxiliar, 0.0, out=auxiliar)
+        np.fmin(auxiliar, x[t], out=rapido[t])
+    return x - rapido
+
+
+def lyne_hollick(caudales, alfa=0.925, pasadas=3):
+
+    """
+    Filtro de Lyne-Hollick con pasadas alternadas hacia adelante y hacia atrás.
+    Parámetros:
+        caudales: array 1D (días) o 2D (estaciones x días) de caudales rellenados.
+        alfa (float): parámetro del filtro.
+        pasadas (int): cantidad de pasadas (impar, empezando hacia adelante).
+    Retorna:
+        array con el flujo base, de la misma forma que `caudales`.
+    """
+    base, es_serie = _como_matriz(caudales)
+    for pasada in range(pasadas):
+        if pasada % 2 == 0:
+            base = _pasada_lyne_hollick(base, alfa)
+        else:
+            base = _pasada_lyne_hollick(np.ascontiguousarray(base[::-1]), alfa)[::-1]
+    return _como_salida(base, es_serie)
+
+
+def eckhardt(caudales, alfa=0.98, bfi_max=0.8):
+
+    """
+    Filtro de dos parámetros de Eckhardt (2005):
+        b_t = ((1 - BFImax) alfa b_{t-1} + (1 - alfa) BFImax Q_t) / (1 - alfa BFImax).
+    Parámetros:
+        caudales: array 1D (días) o 2D (estaciones x días) de caudales rellenados.
+        alfa (float): constante de recesión.
+        bfi_max (float): BFI máximo (0.8 ríos perennes en acuíferos porosos, 0.5 efímeros,
+                         0.25 perennes en roca impermeable).
+    Retorna:
+        array con el flujo base, de la misma forma que `caudales`.
+    """
+    q, es_serie = _como_matriz(caudales)
+    denominador = 1 - alfa * bfi_max
+    base = _filtro_lineal(q, (1 - bfi_max) * alfa / denominador, (1 - alfa) * bfi_max / denominador)
+    return _como_salida(base, es_serie)
+
+
+def chapman_maxwell(caudales, k=0.925):
+
+    """
+    Filtro de Chapman y Maxwell (1996):
+        b_t = k / (2 - k) b_{t-1} + (1 - k) / (2 - k) Q_t.
+    Parámetros:
+        caudales: array 1D (días) o 2D (estaciones x días) de caudales rellenados.
+        k (float): constante de recesión.
+    Retorna:
+        array con el flujo base, de la misma forma que `caudales`.
+    """
+    q, es_serie = _como_matriz(caudales)
+    base = _filtro_lineal(q, k / (2 - k), (1 - k) / (2 - k))
+    return _como_salida(base, es_serie)
+
+
+def separar_flujo_base(caudales, metodo="eckhardt", **parametros):
+
+    """
+    Separa el caudal en flujo base y escurrimiento rápido.
+    Parámetros:
+        caudales: array 1D (días) o 2D (estaciones x días) de caudales rellenados.
+        metodo (str): "lyne_hollick", "eckhardt" o "chapman_maxwell".
+        parametros: parámetros del filtro elegido.
+    Retorna:
+        base, rapido: arrays de la misma forma que `caudales`.
+    """
+    filtros = {"lyne_hollick": lyne_hollick, "eckhardt": eckhardt, "chapman_maxwell": chapman_maxwell}
+    if metodo not in filtros:
+        raise ValueError(f"Método desconocido: {metodo}. Métodos disponibles: {', '.join(FILTROS)}.")
+    base = filtros[metodo](caudales, **parametros)
+    return base, np.asarray(caudales, dtype=float) - base
+
+
+#----------------------------------
+#     ÍNDICE DE FLUJO BASE (BFI)
+#----------------------------------
+
+def indice_flujo_base(fechas_array, caudales, base):
+
+    """
+    Índice de flujo base (volumen de flujo base / volumen total) por año y total.
+    Parámetros:
+        fechas_array: array de fechas (datetime.date), común a todas las estaciones.
+        caudales: array 1D (días) o 2D (estaciones x días) de caudales.
+        base: flujo base, de la misma forma que `caudales`.
+    Retorna:
+        anios: array de años (consecutivos, del primero al último).
+        bfi_anual: BFI de cada año (estaciones x años, o un array de años para una serie).
+        bfi: BFI de todo el registro (uno por estación, o un escalar para una serie).
+    """
+    caudales = np.atleast_2d(np.asarray(caudales, dtype=float))
+    base = np.atleast_2d(np.asarray(base, dtype=float))
+    anios = np.asarray(fechas_array, dtype="datetime64[D]").astype("datetime64[Y]").astype(int) + 1970
+    primero = anios.min()
+    cantidad = anios.max() - primero + 1
+
+    validos = ~np.isnan(caudales) & ~np.isnan(base)
+    estaciones = caudales.shape[0]
+    indice = (np.arange(estaciones)[:, None] * cantidad + (anios - primero)[None, :])[validos]
+    volumen_base = np.bincount(indice, weights=base[validos], minlength=estaciones * cantidad)
+    volumen_total = np.bincount(indice, weights=caudales[validos], minlength=estaciones * cantidad)
+    volumen_base = volumen_base.reshape(estaciones, cantidad)
+    volumen_total = volumen_total.reshape(estaciones, cantidad)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bfi_anual = volumen_base / volumen_total
+        bfi = volumen_base.sum(axis=1) / volumen_total.sum(axis=1)
+    anios_salida = np.arange(primero, primero + cantidad)
+    if estaciones == 1:
+        return anios_salida, bfi_anual[0], bfi[0]
+    return anios_salida, bfi_anual, bfi
+
+
+def flujo_base_red(estaciones, metodo="eckhardt", max_interpolacion=7, **parametros):
+
+    """
+    Separación de flujo base y BFI de muchas estaciones con una sola pasada del filtro.
+    Las series se rellenan y se ubican en un eje de fechas común; los días fuera del
+    registro de cada estación quedan en NaN y el filtro arranca en su primer dato.
+    Parámetros:
+        estaciones: lista de pares (fechas_array, caudales) como los de convertir_formatos.
+        metodo (str): filtro a usar (ver separar_flujo_base).
+        max_interpolacion (int): ver rellenar_serie.
+    Retorna:
+        dict con fechas (datetime64), base y rapido (estaciones x días), anios,
+        bfi_anual (estaciones x años) y bfi (uno por estación).
+    """
+    fechas = [np.asarray(f, dtype="datetime64[D]") for f, _ in estaciones]
+    inicio = min(f.min() for f in fechas)
+    dias = (max(f.max() for f in fechas) - inicio).astype(int) + 1
+    caudales = np.full((len(estaciones), dias), np.nan)
+    for i, (f, (fechas_array, serie)) in enumerate(zip(fechas, estaciones)):
+        caudales[i, (f - inicio).astype(int)] = rellenar_serie(fechas_array, serie, max_interpolacion)
+
+    base, rapido = separar_flujo_base(caudales, metodo, **parametros)
+    eje = inicio + np.arange(dias)
+    anios, bfi_anual, bfi = indice_flujo_base(eje, caudales, base)
+    return {"fechas": eje, "base": base, "rapido": rapido, "anios": anios,
+            "bfi_anual": np.atleast_2d(bfi_anual), "bfi": np.atleast_1d(bfi)}
+
+
+#----------------------------------
+#     BENCHMARK DE RENDIMIENTO
+#----------------------------------
+
+# Versiones directas con un bucle de Python por estación, usadas como referencia.
+
+def _lyne_hollick_python(q, alfa=0.925, pasadas=3):
+    x = list(q)
+    for pasada in range(pasadas):
+        if pasada % 2 == 1:
+            x.reverse()
+        rapido = 0.0
+        base = [x[0]]
+        for t in range(1, len(x)):
+            rapido = alfa * rapido + (1 + alfa) / 2 * (x[t] - x[t - 1])
+            rapido = min(max(rapido, 0.0), x[t])
+            base.append(x[t] - rapido)
+        if pasada % 2 == 1:
+            base.reverse()
+        x = base
+    return np.array(x)
+
+
+def _lineal_python(q, a, c):
+    base = [q[0]]
+    for t in range(1, len(q)):
+        base.append(min(a * base[-1] + c * q[t], q[t]))
+    return np.array(base)
+
+
+def _eckhardt_python(q, alfa=0.98, bfi_max=0.8):
+    denominador = 1 - alfa * bfi_max
+    return _lineal_python(q, (1 - bfi_max) * alfa / denominador, (1 - alfa) * bfi_max / denominador)
+
+
+def _chapman_maxwell_python(q, k=0.925):
+    return _lineal_python(q, k / (2 - k), (1 - k) / (2 - k))
+
+
+def benchmark_flujo_base(estaciones=200, anios=50, semilla=0):
+
+    """
+    Compara los filtros vectorizados (todas las estaciones juntas) contra un bucle de Python
+    por estación, sobre una red sintética de `estaciones` series diarias de `anios` años.
+    También mide una sola serie de 100 años, el caso de la aplicación.
+    Retorna:
+        dict con los tiempos en segundos y la diferencia máxima entre ambas versiones.
+    """
+    generador = np.random.default_rng(semilla)
+    dias = anios * 365
+    estacional = 50 + 30 * np.sin(2 * np.pi * np.arange(dias) / 365.25)
+    caudales = estacional * generador.lognormal(0, 0.5, (estaciones, dias))
+    series = caudales.tolist()
+    serie_larga = (50 + 30 * np.sin(2 * np.pi * np.arange(100 * 365) / 365.25)) * generador.lognormal(0, 0.5, 100 * 365)
+    serie_larga_lista = serie_larga.tolist()
+
+    resultado = {"estaciones": estaciones, "anios": anios}
+    for nombre, vectorizado, directo in (("lyne_hollick", lyne_hollick, _lyne_hollick_python),
+                                         ("eckhardt", eckhardt, _eckhardt_python),
+                                         ("chapman_maxwell", chapman_maxwell, _chapman_maxwell_python)):
+        inicio = time.perf_counter()
+        base = vectorizado(caudales)
+        resultado[f"{nombre}_vectorizado_s"] = round(time.perf_counter() - inicio, 3)
+
+        inicio = time.perf_counter()
+        base_directa = np.array([directo(serie) for serie in series])
+        resultado[f"{nombre}_bucle_python_s"] = round(time.perf_counter() - inicio, 3)
+        resultado[f"{nombre}_diferencia_max"] = float(np.abs(base - base_directa).max())
+
+        inicio = time.perf_counter()
+        vectorizado(serie_larga)
+        resultado[f"{nombre}_una_serie_s"] = round(time.perf_counter() - inicio, 3)
+
+        inicio = time.perf_counter()
+        directo(serie_larga_lista)
+        resultado[f"{nombre}_una_serie_bucle_python_s"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+if __name__ == "__main__":
+    print(benchmark_flujo_base())
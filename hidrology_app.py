@@ -5,6 +5,9 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 import calendar
 import io
+from curvas_duracion import GRILLA_EXCEDENCIA, curva_duracion_grilla, curvas_por_decada, matriz_curvas
+from tendencias import tendencias_estacion
+from flujo_base import FILTROS, indice_flujo_base, rellenar_serie, separar_flujo_base
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Análisis Hidrométrico", layout="wide")
@@ -92,11 +95,11 @@ def indicadores_hidrologicos(alturas_masked, fechas_array):
     
     df = df.dropna()
 
-    # Percentiles importantes
+    # Percentiles importantes (de no excedencia)
     q10 = df['caudal'].quantile(0.10)
     q50 = df['caudal'].quantile(0.50)
     q90 = df['caudal'].quantile(0.90)
-    q95 = df['caudal'].quantile(0.05)
+    q95 = df['caudal'].quantile(0.95)
     
     # Coeficiente de variación
     coef_var = df['caudal'].std() / df['caudal'].mean()
@@ -114,10 +117,12 @@ st.markdown("Sube tu archivo de datos para generar estadísticas y gráficos aut
 
 # Sidebar
 archivos_subidos = st.sidebar.file_uploader("Selecciona archivos .txt", type=["txt"], accept_multiple_files=True)
+filtro_base = st.sidebar.selectbox("Filtro de flujo base", FILTROS, index=1)
 
 if archivos_subidos:
     resumen_para_excel = []
     dict_hojas = {}
+    series_estaciones = {}
 
     for archivo in archivos_subidos:
         # Procesamiento
@@ -148,7 +153,7 @@ if archivos_subidos:
         col6.metric("Datos observados", int(obs))
 
         # Pestañas de Gráficos (Tal cual tu imagen)
-        tab1, tab2, tab3 = st.tabs(["Evolución temporal", "Ciclo anual", "Curva de duración"])
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Evolución temporal", "Ciclo anual", "Curva de duración", "Tendencias", "Flujo base"])
         
         df_plot = pd.DataFrame({'fecha': pd.to_datetime(fec), 'caudal': alt})
 
@@ -166,13 +171,48 @@ if archivos_subidos:
             st.pyplot(fig2)
 
         with tab3:
-            datos_sort = np.sort(alt.compressed())[::-1]
-            prob = np.arange(1, len(datos_sort) + 1) / len(datos_sort) * 100
             fig3, ax3 = plt.subplots(figsize=(10, 4))
-            ax3.plot(prob, datos_sort)
+            ax3.plot(GRILLA_EXCEDENCIA, curva_duracion_grilla(alt), color='black', label='Período de registro')
+            decadas, curvas = curvas_por_decada(fec, alt)
+            for decada, curva in zip(decadas, curvas):
+                ax3.plot(GRILLA_EXCEDENCIA, curva, alpha=0.6, label=f"{decada}s")
             ax3.invert_xaxis()
             ax3.set_title("Curva de Duración")
+            ax3.legend()
             st.pyplot(fig3)
+
+        with tab4:
+            tend = tendencias_estacion(fec, alt)
+            anual = tend['anual']
+            anios = tend['anios']
+            validos = int(np.isfinite(tend['medias_anuales']).sum())
+            if validos < 3:
+                st.info(f"Se necesitan al menos 3 años con datos suficientes para analizar tendencias (hay {validos}).")
+            else:
+                fig5, ax5 = plt.subplots(figsize=(10, 4))
+                ax5.plot(anios, tend['medias_anuales'], marker='o', color='blue', label='Caudal medio anual')
+                centro = np.nanmedian(tend['medias_anuales']) + anual['pendiente_sen'] * (anios - np.median(anios))
+                ax5.plot(anios, centro, color='red', linestyle='--', label='Pendiente de Sen')
+                if anual['pettitt_p'] < 0.05:
+                    ax5.axvline(anual['pettitt_cambio'], color='gray', linestyle=':', label='Punto de cambio (Pettitt)')
+                ax5.legend()
+                st.pyplot(fig5)
+                col7, col8, col9 = st.columns(3)
+                col7.metric("Pendiente de Sen", f"{anual['pendiente_sen']:.3f} m³/s/año")
+                col8.metric("Mann-Kendall (p)", f"{anual['p']:.3f}")
+                col9.metric("Pettitt (p)", f"{anual['pettitt_p']:.3f}")
+
+        with tab5:
+            rellena = rellenar_serie(fec, alt)
+            base, rapido = separar_flujo_base(rellena, filtro_base)
+            anios_bfi, bfi_anual, bfi = indice_flujo_base(fec, rellena, base)
+            fig6, ax6 = plt.subplots(figsize=(10, 4))
+            ax6.plot(df_plot['fecha'], rellena, color='blue', label='Caudal (rellenado)')
+            ax6.plot(df_plot['fecha'], base, color='brown', label='Flujo base')
+            ax6.legend()
+            st.pyplot(fig6)
+            st.metric("Índice de flujo base (BFI)", f"{bfi:.3f}")
+            st.bar_chart(pd.Series(bfi_anual, index=anios_bfi, name="BFI anual"))
         
         st.divider() # Separador entre estaciones
 
@@ -182,6 +222,19 @@ if archivos_subidos:
             "Mínimo": minimo, "Q50": q50, "Faltantes": falt, "Observados": obs
         })
         dict_hojas[nombre_estacion] = df_plot
+        series_estaciones[nombre_estacion] = alt
+
+    # --- COMPARACIÓN DE CURVAS DE DURACIÓN ---
+    if len(series_estaciones) > 1:
+        st.header("Comparación de curvas de duración")
+        curvas_estaciones = matriz_curvas(list(series_estaciones.values()))
+        fig4, ax4 = plt.subplots(figsize=(10, 4))
+        for nombre, curva in zip(series_estaciones, curvas_estaciones):
+            ax4.plot(GRILLA_EXCEDENCIA, curva, label=nombre)
+        ax4.invert_xaxis()
+        ax4.set_yscale('log')
+        ax4.legend()
+        st.pyplot(fig4)
 
     # --- BOTÓN EXCEL EN SIDEBAR ---
     output = io.BytesIO()
@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+GENERADOR DE REPORTES
+
+Genera los reportes de resultados de una o muchas estaciones a partir de un resumen
+estructurado (ResumenEstacion), en texto plano, Markdown, HTML o JSON. Cada reporte se arma
+completo en memoria a partir de una plantilla y se escribe con una sola operación; los
+reportes de muchas estaciones pueden escribirse en paralelo y se acompañan de una tabla
+resumen de la red.
+
+Uso:
+    python reportes.py estacion1.txt estacion2.txt --formatos txt html --directorio reportes
+    python reportes.py --benchmark
+"""
+#===================================================
+#    GENERADOR DE REPORTES
+#===================================================
+
+
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from datetime import date, timedelta
+from string import Template
+
+
+# Texto que ocupa el lugar de los valores no finitos en txt, md y html (null en JSON).
+SIN_VALOR = "—"
+
+
+#----------------------------------
+#       RESUMEN ESTRUCTURADO
+#----------------------------------
+
+@dataclass
+class ResumenEstacion:
+
+    """
+    Resultados del análisis de una estación. Los caudales están en m³/s y las cantidades
+    de datos en días. Los percentiles q10...q95 son cuantiles de no excedencia (q95 es el
+    caudal superado sólo el 5 % del tiempo); el caudal ecológico es el caudal superado el
+    95 % del tiempo.
+    """
+
+    estacion: str
+    longitud: int
+    fecha_inicial: date
+    fecha_final: date
+    datos_observados: int
+    datos_faltantes: int
+    media: float
+    maximo: float
+    minimo: float
+    desviacion: float
+    q10: float
+    q50: float
+    q90: float
+    q95: float
+    caudal_ecologico: float
+    coef_var: float
+
+    def __post_init__(self):
+        # Los resultados suelen llegar como escalares de numpy; los pasamos a tipos de Python
+        # para poder serializarlos a JSON. Los valores faltantes (None) quedan como NaN.
+        for campo in fields(self):
+            valor = getattr(self, campo.name)
+            if campo.type is float and valor is None:
+                valor = math.nan
+            if campo.type in (int, float):
+                setattr(self, campo.name, campo.type(valor))
+
+    @classmethod
+    def desde_resultado(cls, resultado):
+
+        """
+        Crea el resumen a partir del dict que devuelve servicio_api.procesar_archivo.
+        """
+        observaciones = resultado["observaciones"]
+        estadisticas = resultado["estadisticas"]
+        indicadores = resultado["indicadores"]
+        return cls(estacion=resultado["estacion"],
+                   longitud=observaciones["longitud"],
+                   fecha_inicial=date.fromisoformat(observaciones["fecha_inicial"]),
+                   fecha_final=date.fromisoformat(observaciones["fecha_final"]),
+                   datos_observados=observaciones["datos_observados"],
+                   datos_faltantes=observaciones["datos_faltantes"],
+                   media=estadisticas["media"],
+                   maximo=estadisticas["maximo"],
+                   minimo=estadisticas["minimo"],
+                   desviacion=estadisticas["desviacion"],
+                   q10=indicadores["q10"],
+                   q50=indicadores["q50"],
+                   q90=indicadores["q90"],
+                   q95=indicadores["q95"],
+                   caudal_ecologico=indicadores["caudal_ecologico"],
+                   coef_var=indicadores["coef_var"])
+
+    def como_dict(self):
+        datos = asdict(self)
+        # JSON no admite NaN ni infinitos: los informamos como null.
+        for clave, valor in datos.items():
+            if isinstance(valor, float) and not math.isfinite(valor):
+                datos[clave] = None
+        datos["fecha_inicial"] = self.fecha_inicial.isoformat()
+        datos["fecha_final"] = self.fecha_final.isoformat()
+        return datos
+
+    def valores_formateados(self):
+
+        """
+        Valores listos para las plantillas: caudales con 2 decimales y el coeficiente de
+        variación con 3. Los valores no finitos (null en JSON) se muestran como SIN_VALOR.
+        """
+        valores = self.como_dict()
+        decimales = {"media": 2, "maximo": 2, "minimo": 2, "desviacion": 2, "q10": 2, "q50": 2,
+                     "q90": 2, "q95": 2, "caudal_ecologico": 2, "coef_var": 3}
+        for campo, cifras in decimales.items():
+            valor = getattr(self, campo)
+            valores[campo] = f"{valor:.{cifras}f}" if math.isfinite(valor) else SIN_VALOR
+        return valores
+
+
+#----------------------------------
+#            PLANTILLAS
+#----------------------------------
+
+PLANTILLAS = {
+    "txt": Template("""\
+Resultados de la estación: $estacion
+====================================
+Longitud de la serie temporal: $longitud días
+Período de datos: $fecha_inicial a $fecha_final
+Datos observados: $datos_observados días
+Datos faltantes: $datos_faltantes días
+Media: $media m³/s
+Valor máximo: $maximo m³/s
+Valor mínimo: $minimo m³/s
+Desviación estándar: $desviacion m³/s
+
+INDICADORES HIDROLÓGICOS
+====================================
+Q10: $q10 m³/s
+Q50 (mediana): $q50 m³/s
+Q90: $q90 m³/s
+Q95: $q95 m³/s
+Caudal ecológico (superado el 95 % del tiempo): $caudal_ecologico m³/s
+Coeficiente de variación: $coef_var
+"""),
+
+    "md": Template("""\
+# Resultados de la estación: $estacion
+
+| Dato | Valor |
+|---|---|
+| Longitud de la serie temporal | $longitud días |
+| Período de datos | $fecha_inicial a $fecha_final |
+| Datos observados | $datos_observados días |
+| Datos faltantes | $datos_faltantes días |
+| Media | $media m³/s |
+| Valor máximo | $maximo m³/s |
+| Valor mínimo | $minimo m³/s |
+| Desviación estándar | $desviacion m³/s |
+
+## Indicadores hidrológicos
+
+| Indicador | Valor |
+|---|---|
+| Q10 | $q10 m³/s |
+| Q50 (mediana) | $q50 m³/s |
+| Q90 | $q90 m³/s |
+| Q95 | $q95 m³/s |
+| Caudal ecológico (superado el 95 % del tiempo) | $caudal_ecologico m³/s |
+| Coeficiente de variación | $coef_var |
+"""),
+
+    "html": Template("""\
+<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Resultados: $estacion</title></head>
+<body>
+<h1>Resultados de la estación: $estacion</h1>
+<table>
+<tr><td>Longitud de la serie temporal</td><td>$longitud días</td></tr>
+<tr><td>Período de datos</td><td>$fecha_inicial a $fecha_final</td></tr>
+<tr><td>Datos observados</td><td>$datos_observados días</td></tr>
+<tr><td>Datos faltantes</td><td>$datos_faltantes días</td></tr>
+<tr><td>Media</td><td>$media m³/s</td></tr>
+<tr><td>Valor máximo</td><td>$maximo m³/s</td></tr>
+<tr><td>Valor mínimo</td><td>$minimo m³/s</td></tr>
+<tr><td>Desviación estándar</td><td>$desviacion m³/s</td></tr>
+</table>
+<h2>Indicadores hidrológicos</h2>
+<table>
+<tr><td>Q10</td><td>$q10 m³/s</td></tr>
+<tr><td>Q50 (mediana)</td><td>$q50 m³/s</td></tr>
+<tr><td>Q90</td><td>$q90 m³/s</td></tr>
+<tr><td>Q95</td><td>$q95 m³/s</td></tr>
+<tr><td>Caudal ecológico (superado el 95 % del tiempo)</td><td>$caudal_ecologico m³/s</td></tr>
+<tr><td>Coeficiente de variación</td><td>$coef_var</td></tr>
+</table>
+</body>
+</html>
+"""),
+}
+
+# Tabla de la red: encabezado, fila (una por estación) y cierre para cada formato.
+COLUMNAS_RED = ("estacion", "fecha_inicial", "fecha_final", "datos_observados", "datos_faltantes",
+                "media", "maximo", "minimo", "q50", "caudal_ecologico", "coef_var")
+TITULOS_RED = ("Estación", "Desde", "Hasta", "Observados (días)", "Faltantes (días)",
+               "Media (m³/s)", "Máximo (m³/s)", "Mínimo (m³/s)", "Q50 (m³/s)",
+               "Caudal ecológico (m³/s)", "Coef. variación")
+
+PLANTILLAS_RED = {
+    "txt": ("\t".join(TITULOS_RED) + "\n",
+            Template("\t".join(f"${columna}" for columna in COLUMNAS_RED) + "\n"),
+            ""),
+    "md": ("| " + " | ".join(TITULOS_RED) + " |\n|" + "---|" * len(TITULOS_RED) + "\n",
+           Template("| " + " | ".join(f"${columna}" for columna in COLUMNAS_RED) + " |\n"),
+           ""),
+    "html": ("<!DOCTYPE html>\n<html lang=\"es\">\n<head><meta charset=\"utf-8\"><title>Resumen de la red</title></head>\n"
+             "<body>\n<table>\n<tr>" + "".join(f"<th>{titulo}</th>" for titulo in TITULOS_RED) + "</tr>\n",
+             Template("<tr>" + "".join(f"<td>${columna}</td>" for columna in COLUMNAS_RED) + "</tr>\n"),
+             "</table>\n</body>\n</html>\n"),
+}
+
+FORMATOS = ("txt", "md", "html", "json")
+
+
+#----------------------------------
+#          RENDERIZADO
+#----------------------------------
+
+def _valores_para(resumen, formato):
+    valores = resumen.valores_formateados()
+    if formato == "html":
+        valores = {clave: html.escape(str(valor)) for clave, valor in valores.items()}
+    return valores
+
+
+def renderizar(resumen, formato="txt"):
+
+    """
+    Genera el reporte de una estación.
+    Parámetros:
+        resumen (ResumenEstacion): resultados de la estación.
+        formato (str): "txt", "md", "html" o "json".
+    Retorna:
+        str con el reporte completo.
+    """
+    if formato == "json":
+        return json.dumps(resumen.como_dict(), ensure_ascii=False, allow_nan=False, indent=2) + "\n"
+    if formato not in PLANTILLAS:
+        raise ValueError(f"Formato desconocido: {formato}. Formatos disponibles: {', '.join(FORMATOS)}.")
+    return PLANTILLAS[formato].substitute(_valores_para(resumen, formato))
+
+
+def tabla_red(resumenes, formato="txt"):
+
+    """
+    Genera la tabla resumen de todas las estaciones de la red (una fila por estación).
+    Parámetros:
+        resumenes: lista de ResumenEstacion.
+        formato (str): "txt", "md", "html" o "json".
+    Retorna:
+        str con la tabla completa.
+    """
+    if formato == "json":
+        return json.dumps([resumen.como_dict() for resumen in resumenes], ensure_ascii=False, allow_nan=False, indent=2) + "\n"
+    if formato not in PLANTILLAS_RED:
+        raise ValueError(f"Formato desconocido: {formato}. Formatos disponibles: {', '.join(FORMATOS)}.")
+    encabezado, fila, cierre = PLANTILLAS_RED[formato]
+    filas = [fila.substitute(_valores_para(resumen, formato)) for resumen in resumenes]
+    return encabezado + "".join(filas) + cierre
+
+
+#----------------------------------
+#           ESCRITURA
+#----------------------------------
+
+def nombre_reporte(resumen, formato="txt"):
+    # El nombre de la estación viene del archivo o de la solicitud: reemplazamos separadores
+    # y cualquier otro carácter no seguro para que el reporte quede siempre en `directorio`.
+    # Si hubo que cambiarlo, agregamos un hash corto del nombre original para que dos
+    # estaciones distintas ("a b" y "a_b") no terminen en el mismo archivo.
+    estacion = str(resumen.estacion)
+    seguro = re.sub(r"[^\w.-]+", "_", estacion).strip(".") or "_"
+    if seguro != estacion:
+        seguro += "_" + hashlib.sha1(estacion.encode("utf-8")).hexdigest()[:8]
+    return f"resultados_{seguro}.{formato}"
+
+
+def escribir_reporte(resumen, directorio=".", formato="txt"):
+
+    """
+    Escribe el reporte de una estación con una única escritura.
+    Retorna:
+        str con la ruta del archivo generado.
+    """
+    ruta = os.path.join(directorio, nombre_reporte(resumen, formato))
+    contenido = renderizar(resumen, formato)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(contenido)
+    return ruta
+
+
+def escribir_reportes(resumenes, directorio=".", formatos=("txt",), hilos=None, tabla=True):
+
+    """
+    Escribe los reportes de muchas estaciones en paralelo y, opcionalmente, la tabla de la
+    red (resumen_red.<formato>).
+    Parámetros:
+        resumenes: lista de ResumenEstacion.
+        directorio (str): carpeta de salida (se crea si no existe).
+        formatos: formatos a generar.
+        hilos (int): hilos de escritura; por defecto, uno por CPU (hasta 8).
+        tabla (bool): si se escribe la tabla resumen de la red.
+    Retorna:
+        lista con las rutas de los archivos generados.
+    """
+    nombres = [nombre_reporte(resumen) for resumen in resumenes]
+    repetidos = sorted({nombre for nombre in nombres if nombres.count(nombre) > 1})
+    if repetidos:
+        # Los hilos escribirían el mismo archivo a la vez y un reporte se perdería.
+        raise ValueError(f"Hay estaciones con el mismo nombre de reporte: {', '.join(repetidos)}.")
+
+    os.makedirs(directorio, exist_ok=True)
+    if hilos is None:
+        hilos = min(8, os.cpu_count() or 1)
+    trabajos = [(resumen, formato) for resumen in resumenes for formato in formatos]
+    escribir = lambda trabajo: escribir_reporte(trabajo[0], directorio, trabajo[1])
+    if hilos <= 1:
+        rutas = [escribir(trabajo) for trabajo in trabajos]
+    else:
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            rutas = list(pool.map(escribir, trabajos))
+
+    if tabla:
+        for formato in formatos:
+            ruta = os.path.join(directorio, f"resumen_red.{formato}")
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                archivo.write(tabla_red(resumenes, formato))
+            rutas.append(ruta)
+    return rutas
+
+
+def _resumir_archivo(ruta):
+    from servicio_api import procesar_archivo
+
+    with open(ruta, "rb") as archivo:
+        contenido = archivo.read()
+    stid = os.path.splitext(os.path.basename(ruta))[0]
+    # Los reportes no usan la curva de duración: no la calculamos.
+    return ResumenEstacion.desde_resultado(procesar_archivo(contenido, stid))
+
+
+def reportes_desde_archivos(rutas, directorio=".", formatos=("txt",), trabajadores=4, hilos=None):
+
+    """
+    Analiza muchos archivos de estaciones en un pool de procesos y escribe sus reportes.
+    El nombre de cada estación es el nombre del archivo sin extensión.
+    Retorna:
+        lista con las rutas de los archivos generados.
+    """
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        resumenes = list(pool.map(_resumir_archivo, rutas))
+    return escribir_reportes(resumenes, directorio, formatos, hilos)
+
+
+#----------------------------------
+#     BENCHMARK DE RENDIMIENTO
+#----------------------------------
+
+def _escribir_campo_por_campo(resumen, directorio):
+    # Forma anterior (resultados_txt): una escritura por campo.
+    with open(os.path.join(directorio, nombre_reporte(resumen)), "w", encoding="utf-8") as archivo:
+        for linea in renderizar(resumen).splitlines(keepends=True):
+            archivo.write(linea)
+
+
+def benchmark_reportes(estaciones=5000, directorio="benchmark_reportes", hilos=8):
+
+    """
+    Compara la escritura de `estaciones` reportes de texto campo por campo (como
+    resultados_txt) contra escribir_reportes con un hilo y con `hilos` hilos. Los hilos
+    sólo ayudan cuando la escritura espera al disco (por ejemplo, en discos de red).
+    Retorna:
+        dict con los tiempos en segundos.
+    """
+    base = {campo.name: 1.0 for campo in fields(ResumenEstacion)}
+    base.update(longitud=36500, datos_observados=35000, datos_faltantes=1500,
+                fecha_inicial=date(1920, 1, 1), fecha_final=date(1920, 1, 1) + timedelta(days=36499))
+    resumenes = [ResumenEstacion(**dict(base, estacion=f"E{i:05d}")) for i in range(estaciones)]
+    os.makedirs(directorio, exist_ok=True)
+
+    inicio = time.perf_counter()
+    for resumen in resumenes:
+        _escribir_campo_por_campo(resumen, directorio)
+    campo_por_campo = time.perf_counter() - inicio
+
+    resultado = {"estaciones": estaciones, "campo_por_campo_s": round(campo_por_campo, 3)}
+    for cantidad in (1, hilos):
+        inicio = time.perf_counter()
+        escribir_reportes(resumenes, directorio, hilos=cantidad, tabla=False)
+        resultado[f"escribir_reportes_{cantidad}_hilos_s"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+#-------------------------------------
+#           EJECUCIÓN
+#-------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera reportes de estaciones hidrométricas.")
+    parser.add_argument("archivos", nargs="*")
+    parser.add_argument("--directorio", default="reportes")
+    parser.add_argument("--formatos", nargs="+", default=["txt"], choices=FORMATOS)
+    parser.add_argument("--trabajadores", type=int, default=4)
+    parser.add_argument("--benchmark", action="store_true")
+    argumentos = parser.parse_args()
+
+    if argumentos.benchmark:
+        print(benchmark_reportes())
+    else:
+        rutas = reportes_desde_archivos(argumentos.archivos, argumentos.directorio,
+                                        argumentos.formatos, argumentos.trabajadores)
+        print(f"Se generaron {len(rutas)} archivos en '{argumentos.directorio}'.")
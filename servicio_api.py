@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""
+SERVICIO HTTP/JSON DE ANÁLISIS HIDROMÉTRICO
+
+Expone el procesamiento de "Analisis hidrometrico.py" (observaciones, estadisticas,
+indicadores_hidrologicos y curva_duracion) como un servicio HTTP local para que otros
+programas puedan obtener los resultados sin pasar por la interfaz de Streamlit.
+
+Uso:
+    python servicio_api.py --puerto 8600 --catalogo ./datos
+    python servicio_api.py --benchmark
+"""
+#===================================================
+#    SERVICIO LOCAL DE ANÁLISIS (HTTP/JSON)
+#===================================================
+
+
+import argparse
+import hashlib
+import math
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+import numpy as np
+
+
+RUTA_ANALISIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Analisis hidrometrico.py")
+TAMANIO_MAXIMO = 50 * 1024 * 1024   # tamaño máximo de archivo subido (bytes)
+PUNTOS_CURVA = 101                   # puntos por defecto de la curva de duración
+
+
+#----------------------------------
+#     CARGA DEL MÓDULO DE ANÁLISIS
+#----------------------------------
+
+# El programa principal tiene un espacio en el nombre, por lo que no se puede importar
+# con "import". Lo cargamos una sola vez por proceso a partir de su ruta.
+
+_modulo_analisis = None
+
+def cargar_analisis():
+
+    """
+    Carga el módulo "Analisis hidrometrico.py" y lo guarda para las siguientes llamadas.
+    Retorna:
+        módulo con las funciones leer_archivo, convertir_formatos, observaciones, etc.
+    """
+    global _modulo_analisis
+    if _modulo_analisis is None:
+        spec = importlib.util.spec_from_file_location("analisis_hidrometrico", RUTA_ANALISIS)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        _modulo_analisis = modulo
+    return _modulo_analisis
+
+
+#--------------------------------
+#    PROCESAMIENTO (EN EL POOL)
+#--------------------------------
+
+#>>>>>> ANÁLISIS DE UN ARCHIVO <<<<<<
+
+def _numero(valor):
+    # JSON no admite NaN ni infinitos: los informamos como null.
+    valor = float(valor)
+    return valor if math.isfinite(valor) else None
+
+
+
+def procesar_archivo(contenido, stid, puntos=None):
+
+    """
+    Ejecuta el análisis completo (sin gráficos) sobre el contenido de un archivo .txt.
+    Se ejecuta dentro de un proceso del pool, por eso recibe y devuelve datos simples.
+    Parámetros:
+        contenido (bytes): contenido del archivo de datos.
+        stid (str): nombre de la estación.
+        puntos (int): puntos de la curva de duración; con None no se calcula la curva.
+    Retorna:
+        dict serializable a JSON con el resumen y la curva de duración.
+    """
+    analisis = cargar_analisis()
+
+    # leer_archivo trabaja con rutas, así que escribimos el contenido en un archivo temporal.
+    descriptor, ruta = tempfile.mkstemp(suffix=".txt")
+    try:
+        with os.fdopen(descriptor, "wb") as temporal:
+            temporal.write(contenido)
+        encabezado, datos = analisis.leer_archivo(ruta)
+    finally:
+        os.remove(ruta)
+
+    if not datos:
+        raise ValueError("El archivo no contiene datos con el formato esperado.")
+
+    fechas_array, alturas_masked = analisis.convertir_formatos(datos)
+    if alturas_masked.count() == 0:
+        raise ValueError("El archivo no contiene datos válidos (todos los valores son faltantes).")
+    longitud, fecha_inicial, fecha_final, datos_faltantes, datos_obs = analisis.observaciones(fechas_array, alturas_masked)
+    valor_medio, valor_maximo, valor_minimo, desviacion, mes_max, mes_min = analisis.estadisticas(alturas_masked, fechas_array)
+    q10, q50, q90, q95, coef_var, maximos_anuales = analisis.indicadores_hidrologicos(alturas_masked, fechas_array)
+    caudal_ecologico, _ = analisis.curva_duracion(alturas_masked, [95])
+
+    resultado = {
+        "estacion": stid,
+        "observaciones": {
+            "longitud": int(longitud),
+            "fecha_inicial": fecha_inicial.isoformat(),
+            "fecha_final": fecha_final.isoformat(),
+            "datos_observados": int(datos_obs),
+            "datos_faltantes": int(datos_faltantes),
+        },
+        "estadisticas": {
+            "media": _numero(valor_medio),
+            "maximo": _numero(valor_maximo),
+            "minimo": _numero(valor_minimo),
+            "desviacion": _numero(desviacion),
+            "fecha_maximo": mes_max.isoformat(),
+            "fecha_minimo": mes_min.isoformat(),
+        },
+        "indicadores": {
+            "q10": _numero(q10),
+            "q50": _numero(q50),
+            "q90": _numero(q90),
+            "q95": _numero(q95),
+            "caudal_ecologico": _numero(caudal_ecologico[0]),
+            "coef_var": _numero(coef_var),
+            "maximos_anuales": {str(anio): _numero(valor) for anio, valor in maximos_anuales.items()},
+        },
+    }
+    if puntos is not None:
+        # La curva se evalúa directamente en una grilla fija, así la respuesta no depende
+        # de la longitud de la serie.
+        caudales_curva, prob_excedencia = analisis.curva_duracion(alturas_masked, np.linspace(0, 100, puntos))
+        resultado["curva_duracion"] = {"excedencia": prob_excedencia.tolist(),
+                                       "caudal": [None if np.isnan(q) else round(float(q), 4) for q in caudales_curva]}
+    return resultado
+
+
+#----------------------------------
+#       CACHÉ DE RESULTADOS
+#----------------------------------
+
+class CacheResultados:
+
+    """
+    Caché LRU de resultados, indexada por el hash del archivo y los parámetros de la solicitud.
+    Es segura para usar desde varios hilos.
+    """
+
+    def __init__(self, capacidad=128):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+#----------------------------------
+#          SERVIDOR HTTP
+#----------------------------------
+
+class ServicioAnalisis:
+
+    """
+    Agrupa el pool de procesos, la caché y el límite de solicitudes concurrentes.
+    Parámetros:
+        trabajadores (int): procesos del pool.
+        max_solicitudes (int): solicitudes de análisis atendidas a la vez; el resto recibe 503.
+        capacidad_cache (int): resultados guardados en la caché.
+        catalogo (str): directorio desde el que se permiten leer archivos por ruta.
+    """
+
+    def __init__(self, trabajadores=2, max_solicitudes=8, capacidad_cache=128, catalogo=None):
+        self.pool = ProcessPoolExecutor(max_workers=trabajadores)
+        self.cache = CacheResultados(capacidad_cache)
+        self.semaforo = threading.BoundedSemaphore(max_solicitudes)
+        self.catalogo = os.path.realpath(catalogo) if catalogo else None
+
+    def leer_catalogo(self, ruta):
+
+        """
+        Lee un archivo del catálogo, verificando que la ruta no salga del directorio permitido.
+        """
+        if self.catalogo is None:
+            raise PermissionError("El servicio no tiene un catálogo configurado.")
+        ruta_real = os.path.realpath(os.path.join(self.catalogo, ruta))
+        if os.path.commonpath([ruta_real, self.catalogo]) != self.catalogo:
+            raise PermissionError("La ruta está fuera del catálogo.")
+        with open(ruta_real, "rb") as archivo:
+            return archivo.read()
+
+    def analizar(self, contenido, stid, puntos):
+
+        """
+        Devuelve el resultado desde la caché o lo calcula en el pool de procesos.
+        Retorna:
+            (dict, bool): resultado y si provino de la caché.
+        """
+        clave = (hashlib.sha256(contenido).hexdigest(), stid, puntos)
+        resultado = self.cache.obtener(clave)
+        if resultado is not None:
+            return resultado, True
+        resultado = self.pool.submit(procesar_archivo, contenido, stid, puntos).result()
+        self.cache.guardar(clave, resultado)
+        return resultado, False
+
+    def cerrar(self):
+        self.pool.shutdown(wait=True)
+
+
+class ManejadorAnalisis(BaseHTTPRequestHandler):
+
+    """
+    Rutas:
+        GET  /salud     -> estado del servicio y de la caché.
+        POST /analisis  -> cuerpo JSON {"ruta", "stid", "puntos"} para archivos del catálogo,
+                           o el archivo .txt crudo con ?stid=...&puntos=... en la URL.
+    """
+
+    servicio = None   # se asigna al crear el servidor
+
+    def log_message(self, formato, *args):
+        pass
+
+    def responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/salud":
+            self.responder(404, {"error": "Ruta no encontrada."})
+            return
+        self.responder(200, {"estado": "ok",
+                             "cache": {"entradas": len(self.servicio.cache),
+                                       "aciertos": self.servicio.cache.aciertos,
+                                       "fallos": self.servicio.cache.fallos}})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/analisis":
+            self.responder(404, {"error": "Ruta no encontrada."})
+            return
+
+        try:
+            longitud = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            longitud = -1
+        if longitud < 0:
+            self.responder(400, {"error": "Encabezado Content-Length inválido."})
+            return
+        if longitud > TAMANIO_MAXIMO:
+            self.responder(413, {"error": "Archivo demasiado grande."})
+            return
+
+        # Si ya hay demasiadas solicitudes en curso, rechazamos en lugar de encolar. Se hace
+        # antes de leer el cuerpo: así el semáforo también acota la memoria usada por los
+        # archivos recibidos. El cuerpo no leído queda en el socket, por eso cerramos la conexión.
+        if not self.servicio.semaforo.acquire(blocking=False):
+            self.close_connection = True
+            self.responder(503, {"error": "Servicio ocupado, intente nuevamente."})
+            return
+        try:
+            cuerpo = self.rfile.read(longitud)
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                parametros = json.loads(cuerpo or b"{}")
+                if not isinstance(parametros, dict) or not isinstance(parametros.get("ruta"), str):
+                    raise ValueError("El cuerpo JSON debe ser un objeto con la clave 'ruta' (texto).")
+                ruta = parametros["ruta"]
+                contenido = self.servicio.leer_catalogo(ruta)
+                stid = parametros.get("stid", os.path.splitext(os.path.basename(ruta))[0])
+                puntos = parametros.get("puntos", PUNTOS_CURVA)
+                if not isinstance(stid, str):
+                    raise ValueError("'stid' debe ser un texto.")
+                if isinstance(puntos, bool) or not isinstance(puntos, (int, str)):
+                    raise ValueError("'puntos' debe ser un número entero.")
+            else:
+                consulta = parse_qs(url.query)
+                contenido = cuerpo
+                stid = consulta.get("stid", ["estacion"])[0]
+                puntos = consulta.get("puntos", [PUNTOS_CURVA])[0]
+            puntos = int(puntos)
+            if not 2 <= puntos <= 10001:
+                raise ValueError("'puntos' debe estar entre 2 y 10001.")
+
+            resultado, desde_cache = self.servicio.analizar(contenido, stid, puntos)
+            self.responder(200, dict(resultado, desde_cache=desde_cache))
+        except (KeyError, TypeError, ValueError) as error:
+            self.responder(400, {"error": str(error)})
+        except PermissionError as error:
+            self.responder(403, {"error": str(error)})
+        except (FileNotFoundError, IsADirectoryError):
+            self.responder(404, {"error": "Archivo no encontrado en el catálogo."})
+        except Exception as error:
+            self.responder(500, {"error": str(error)})
+        finally:
+            self.servicio.semaforo.release()
+
+
+def crear_servidor(servicio, host="127.0.0.1", puerto=8600):
+
+    """
+    Crea el servidor HTTP (un hilo por conexión) asociado al servicio.
+    Retorna:
+        ThreadingHTTPServer listo para serve_forever().
+    """
+    manejador = type("Manejador", (ManejadorAnalisis,), {"servicio": servicio})
+    return ThreadingHTTPServer((host, puerto), manejador)
+
+
+#----------------------------------
+#     BENCHMARK DE RENDIMIENTO
+#----------------------------------
+
+def generar_archivo_sintetico(anios=30, semilla=0):
+
+    """
+    Genera el contenido de un archivo .txt con el formato de entrada y caudales sintéticos.
+    Retorna:
+        bytes con el contenido del archivo.
+    """
+    generador = np.random.default_rng(semilla)
+    inicio = date(1990, 1, 1)
+    dias = anios * 365
+    estacional = 100 + 60 * np.sin(2 * np.pi * np.arange(dias) / 365.25)
+    caudales = estacional * generador.lognormal(0, 0.3, dias)
+    caudales[generador.random(dias) < 0.05] = -999.0
+    lineas = ["# Estación sintética", "# Fecha;Hora;Nivel;Caudal;Calidad"]
+    for i, caudal in enumerate(caudales):
+        lineas.append(f"{inicio + timedelta(days=i)};12:00;0.0;{caudal:.3f};1")
+    return "\n".join(lineas).encode("windows-1252")
+
+
+def benchmark_servicio(solicitudes=200, concurrencia=8, archivos=20, trabajadores=4):
+
+    """
+    Levanta el servicio en un puerto libre y mide el rendimiento con un generador de carga local.
+    Se envían `solicitudes` análisis repartidos entre `archivos` archivos distintos, por lo que
+    las primeras solicitudes de cada archivo se calculan y el resto se sirven desde la caché.
+    Retorna:
+        dict con solicitudes por segundo, latencias y aciertos de caché.
+    """
+    contenidos = [generar_archivo_sintetico(semilla=i) for i in range(archivos)]
+    servicio = ServicioAnalisis(trabajadores=trabajadores, max_solicitudes=concurrencia)
+    servidor = crear_servidor(servicio, puerto=0)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/analisis"
+
+    def enviar(i):
+        solicitud = Request(f"{url}?stid=E{i % archivos}", data=contenidos[i % archivos],
+                            headers={"Content-Type": "text/plain"})
+        inicio = time.perf_counter()
+        try:
+            with urlopen(solicitud) as respuesta:
+                respuesta.read()
+                codigo = respuesta.status
+        except HTTPError as error:
+            codigo = error.code
+        return codigo, time.perf_counter() - inicio
+
+    try:
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrencia) as generador:
+            resultados = list(generador.map(enviar, range(solicitudes)))
+        total = time.perf_counter() - inicio
+    finally:
+        servidor.shutdown()
+        servicio.cerrar()
+
+    latencias = np.array([latencia for codigo, latencia in resultados if codigo == 200])
+    return {
+        "solicitudes": solicitudes,
+        "exitosas": len(latencias),
+        "rechazadas_503": sum(1 for codigo, _ in resultados if codigo == 503),
+        "solicitudes_por_segundo": round(solicitudes / total, 1),
+        "latencia_p50_ms": round(float(np.percentile(latencias, 50)) * 1000, 1),
+        "latencia_p95_ms": round(float(np.percentile(latencias, 95)) * 1000, 1),
+        "aciertos_cache": servicio.cache.aciertos,
+    }
+
+
+#-------------------------------------
+#           EJECUCIÓN
+#-------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP de análisis hidrométrico.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8600)
+    parser.add_argument("--trabajadores", type=int, default=2)
+    parser.add_argument("--max-solicitudes", type=int, default=8)
+    parser.add_argument("--cache", type=int, default=128)
+    parser.add_argument("--catalogo", default=None)
+    parser.add_argument("--benchmark", action="store_true")
+    argumentos = parser.parse_args()
+
+    if argumentos.benchmark:
+        print(json.dumps(benchmark_servicio(), indent=2, ensure_ascii=False))
+    else:
+        servicio = ServicioAnalisis(argumentos.trabajadores, argumentos.max_solicitudes,
+                                    argumentos.cache, argumentos.catalogo)
+        servidor = crear_servidor(servicio, argumentos.host, argumentos.puerto)
+        print(f"Servicio escuchando en http://{argumentos.host}:{argumentos.puerto}")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            servicio.cerrar()
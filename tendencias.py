@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""
+ANÁLISIS DE TENDENCIAS Y PUNTOS DE CAMBIO
+
+Trabaja sobre los agregados anuales y mensuales de la serie enmascarada y calcula, para
+muchas estaciones a la vez:
+    > Prueba de Mann-Kendall, con corrección por autocorrelación (Hamed y Rao, 1998).
+    > Pendiente de Sen.
+    > Prueba de Pettitt para un punto de cambio.
+
+Las series de todas las estaciones se guardan en una matriz estaciones x años (rellena con
+NaN), de modo que cada cálculo es una operación vectorizada sobre toda la red. El estadístico
+S de Mann-Kendall se calcula comparando todos los pares en series cortas y con un método de
+rangos ordenados, O(n log² n), en series largas. En series largas la pendiente de Sen se
+estima sobre una muestra fija de pares (ver MAX_PARES_SEN).
+"""
+#===================================================
+#    TENDENCIAS Y PUNTOS DE CAMBIO
+#===================================================
+
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+
+# Largo a partir del cual S se calcula por rangos ordenados en lugar de comparar todos los pares.
+LARGO_PARES = 256
+
+# Cantidad máxima de pares comparados a la vez (limita la memoria de los cálculos por pares).
+MAX_PARES_BLOQUE = 4_000_000
+
+# Cantidad máxima de pares usados por la pendiente de Sen. Si la serie tiene más pares, la
+# mediana se estima sobre una muestra aleatoria (con semilla fija) de este tamaño.
+MAX_PARES_SEN = 100_000
+
+_normal = NormalDist()
+
+
+#----------------------------------
+#     AGREGADOS ANUALES Y MENSUALES
+#----------------------------------
+
+def _anios_meses(fechas_array):
+    fechas = np.asarray(fechas_array, dtype="datetime64[D]")
+    anios = fechas.astype("datetime64[Y]").astype(int) + 1970
+    meses = fechas.astype("datetime64[M]").astype(int) % 12
+    return anios, meses
+
+
+def _medias_por_grupo(indices, caudales, grupos, min_datos):
+    validos = ~np.ma.getmaskarray(caudales) & ~np.isnan(np.ma.getdata(caudales))
+    conteo = np.bincount(indices[validos], minlength=grupos)
+    suma = np.bincount(indices[validos], weights=np.ma.getdata(caudales)[validos], minlength=grupos)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medias = suma / conteo
+    medias[conteo < min_datos] = np.nan
+    return medias
+
+
+def agregados_anuales(fechas_array, caudales, min_fraccion=0.8):
+
+    """
+    Calcula el caudal medio de cada año.
+    Parámetros:
+        fechas_array: array de fechas (datetime.date).
+        caudales: masked array de caudales.
+        min_fraccion (float): fracción mínima de días con datos para aceptar el año.
+    Retorna:
+        anios: array de años (consecutivos, del primero al último).
+        medias: caudal medio de cada año; NaN si el año no tiene datos suficientes.
+    """
+    anios, _ = _anios_meses(fechas_array)
+    primero = anios.min()
+    cantidad = anios.max() - primero + 1
+    medias = _medias_por_grupo(anios - primero, np.ma.asarray(caudales, dtype=float),
+                               cantidad, min_fraccion * 365)
+    return np.arange(primero, primero + cantidad), medias
+
+
+def agregados_mensuales(fechas_array, caudales, min_fraccion=0.8):
+
+    """
+    Calcula el caudal medio de cada mes de cada año.
+    Parámetros:
+        fechas_array: array de fechas (datetime.date).
+        caudales: masked array de caudales.
+        min_fraccion (float): fracción mínima de días con datos para aceptar el mes.
+    Retorna:
+        anios: array de años (consecutivos, del primero al último).
+        medias: matriz (años x 12); NaN en los meses sin datos suficientes.
+    """
+    anios, meses = _anios_meses(fechas_array)
+    primero = anios.min()
+    cantidad = anios.max() - primero + 1
+    medias = _medias_por_grupo((anios - primero) * 12 + meses, np.ma.asarray(caudales, dtype=float),
+                               cantidad * 12, min_fraccion * 30)
+    return np.arange(primero, primero + cantidad), medias.reshape(cantidad, 12)
+
+
+#--------------------------------
+#     FUNCIONES AUXILIARES
+#--------------------------------
+
+#>>>>>> EMPAQUETAR SERIES <<<<<<
+
+# Los faltantes se eliminan y los datos válidos de cada estación se corren a la izquierda,
+# guardando en una matriz paralela el tiempo (año) de cada dato. Así todas las pruebas
+# trabajan con las primeras n[i] columnas de cada fila.
+
+def _empaquetar(series, tiempos=None):
+
+    """
+    Parámetros:
+        series: array 2D estaciones x tiempo o lista de arrays 1D (NaN o máscara = faltante).
+        tiempos: array 1D común, lista de arrays 1D por estación, o None (0, 1, 2, ...).
+    Retorna:
+        valores, tiempos: matrices (estaciones x n máximo) rellenas con NaN.
+        n: cantidad de datos válidos por estación.
+    """
+    series = [np.ma.asarray(serie, dtype=float) for serie in series]
+    if tiempos is None:
+        tiempos = [np.arange(len(serie), dtype=float) for serie in series]
+    elif np.ndim(tiempos[0]) == 0:
+        tiempos = [np.asarray(tiempos, dtype=float)] * len(series)
+
+    validos = [~np.ma.getmaskarray(serie) & ~np.isnan(serie.data) for serie in series]
+    n = np.array([v.sum() for v in validos], dtype=int)
+    largo = max(n.max(initial=0), 1)
+    valores = np.full((len(series), largo), np.nan)
+    matriz_tiempos = np.full((len(series), largo), np.nan)
+    for i, (serie, tiempo, valido) in enumerate(zip(series, tiempos, validos)):
+        valores[i, :n[i]] = serie.data[valido]
+        matriz_tiempos[i, :n[i]] = np.asarray(tiempo, dtype=float)[valido]
+    return valores, matriz_tiempos, n
+
+
+#>>>>>> RANGOS <<<<<<
+
+def _rangos_medios(valores, n):
+
+    """
+    Rangos (1..n) de cada fila, asignando a los empates el rango medio.
+    Retorna:
+        rangos: matriz con los rangos; NaN fuera de los datos válidos.
+        empates: suma de t(t-1)(2t+5) sobre los grupos de empates de cada fila.
+    """
+    filas, largo = valores.shape
+    orden = np.argsort(valores, axis=1, kind="stable")   # los NaN quedan al final
+    ordenados = np.take_along_axis(valores, orden, axis=1)
+    validos = np.arange(largo) < n[:, None]
+
+    datos = ordenados[validos]
+    fila = np.repeat(np.arange(filas), n)
+    posicion = np.broadcast_to(np.arange(largo), (filas, largo))[validos]
+
+    # Cada grupo de valores iguales dentro de una fila forma una "corrida".
+    inicio = posicion == 0
+    inicio[1:] |= datos[1:] != datos[:-1]
+    corrida = np.cumsum(inicio) - 1
+    t = np.bincount(corrida)
+    rango = posicion[inicio][corrida] + (t[corrida] + 1) / 2
+
+    rangos = np.full(valores.shape, np.nan)
+    rangos[fila, orden[validos]] = rango
+    empates = np.bincount(fila[inicio], weights=t * (t - 1) * (2 * t + 5), minlength=filas)
+    return rangos, empates
+
+
+#>>>>>> ESTADÍSTICO S DE MANN-KENDALL <<<<<<
+
+def _bloques_filas(filas, pares):
+    paso = max(1, MAX_PARES_BLOQUE // max(pares, 1))
+    return [slice(inicio, inicio + paso) for inicio in range(0, filas, paso)]
+
+
+def _s_pares(valores):
+
+    """
+    S = suma de sign(x_j - x_i) para i < j, comparando todos los pares a la vez.
+    Los NaN de relleno no suman.
+    """
+    i, j = np.triu_indices(valores.shape[1], 1)
+    s = np.zeros(valores.shape[0])
+    for bloque in _bloques_filas(valores.shape[0], len(i)):
+        with np.errstate(invalid="ignore"):
+            s[bloque] = np.nansum(np.sign(valores[bloque][:, j] - valores[bloque][:, i]), axis=1)
+    return s
+
+
+def _s_rangos(rangos, n):
+
+    """
+    S calculado por rangos ordenados, como en el ordenamiento por mezcla (merge sort).
+    En cada nivel, cada bloque de ancho w a la derecha se compara con el bloque izquierdo
+    que lo precede: por búsqueda binaria en el bloque izquierdo ordenado se cuenta cuántos
+    valores anteriores son menores y cuántos mayores. Todas las filas y todos los bloques
+    de un nivel se resuelven con un único np.searchsorted.
+    """
+    filas, largo = rangos.shape
+    validos = np.arange(largo) < n[:, None]
+    rango = (2 * rangos[validos]).astype(np.int64)         # rangos medios enteros (x2)
+    fila = np.repeat(np.arange(filas), n).astype(np.int64)
+    posicion = np.broadcast_to(np.arange(largo), (filas, largo))[validos]
+    escala = 2 * largo + 2
+
+    s = np.zeros(filas)
+    ancho = 1
+    while ancho < largo:
+        izquierda = (posicion // ancho) % 2 == 0
+        grupo = fila * (largo // (2 * ancho) + 1) + posicion // (2 * ancho)
+        claves_izq = np.sort(grupo[izquierda] * escala + rango[izquierda])
+        base = grupo[~izquierda] * escala
+        claves_der = base + rango[~izquierda]
+
+        menores = np.searchsorted(claves_izq, claves_der, "left") - np.searchsorted(claves_izq, base, "left")
+        mayores = np.searchsorted(claves_izq, base + escala, "left") - np.searchsorted(claves_izq, claves_der, "right")
+        s += np.bincount(fila[~izquierda], weights=menores - mayores, minlength=filas)
+        ancho *= 2
+    return s
+
+
+#>>>>>> CORRECCIÓN POR AUTOCORRELACIÓN <<<<<<
+
+def _factor_autocorrelacion(valores, tiempos, n, pendiente, alfa):
+
+    """
+    Factor n/n* de Hamed y Rao (1998): autocorrelación de los rangos de la serie sin
+    tendencia, usando sólo los rezagos significativos. Las autocorrelaciones de todos los
+    rezagos se obtienen a la vez con FFT.
+    """
+    filas, largo = valores.shape
+    rangos, _ = _rangos_medios(valores - pendiente[:, None] * tiempos, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centrados = np.nan_to_num(rangos - (np.nansum(rangos, axis=1) / n)[:, None])
+
+    espectro = np.fft.rfft(centrados, 2 * largo, axis=1)
+    covarianza = np.fft.irfft(espectro * np.conj(espectro), 2 * largo, axis=1)[:, :largo]
+
+    k = np.arange(largo)
+    nf = n[:, None].astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (covarianza / (nf - k)) / (covarianza[:, :1] / nf)
+        limite = _normal.inv_cdf(1 - alfa / 2) / np.sqrt(nf)
+    peso = np.clip((nf - k) * (nf - k - 1) * (nf - k - 2), 0, None)
+    significativos = (k >= 1) & (np.abs(r) > limite) & (peso > 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor = 1 + 2 / (nf[:, 0] * (nf[:, 0] - 1) * (nf[:, 0] - 2)) * np.where(significativos, peso * r, 0).sum(axis=1)
+    return np.where(factor > 0, factor, 1.0)
+
+
+#--------------------------------
+#     PRUEBAS ESTADÍSTICAS
+#--------------------------------
+
+#>>>>>> PENDIENTE DE SEN <<<<<<
+
+def _muestra_sen():
+    # Muestra uniforme fija (semilla 0) de MAX_PARES_SEN puntos del cuadrado unitario,
+    # ordenada por la primera coordenada para que los accesos a memoria sean casi secuenciales.
+    u, v = np.random.default_rng(0).random((2, MAX_PARES_SEN))
+    orden = np.argsort(u, kind="stable")
+    return u[orden], v[orden]
+
+
+def _pares_sen(n, muestra):
+
+    """
+    Índices (i, j), i < j, de los pares muestreados para series de n datos (una fila de
+    índices por serie). Todas las series usan la misma muestra, escalada a su propio n: la
+    pendiente de cada estación es reproducible y no depende de las demás estaciones.
+    """
+    u, v = muestra
+    n = np.asarray(n)[:, None]
+    i = (u * n).astype(np.int64)
+    j = (v * (n - 1)).astype(np.int64)
+    j = j + (j >= i)
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def _medianas_pendientes(valores, tiempos, n=None):
+
+    """
+    Mediana por fila de las pendientes entre pares de datos, ignorando NaN. Sin `n` se usan
+    todos los pares de la matriz; con `n` (datos de cada fila), la muestra de _pares_sen.
+    """
+    mediana = np.full(valores.shape[0], np.nan)
+    if n is None:
+        i, j = np.triu_indices(valores.shape[1], 1)
+        tomar = lambda matriz, bloque, indices: matriz[bloque][:, indices]
+    else:
+        muestra = _muestra_sen()
+        tomar = lambda matriz, bloque, indices: np.take_along_axis(matriz[bloque], indices, axis=1)
+    for bloque in _bloques_filas(valores.shape[0], len(i) if n is None else MAX_PARES_SEN):
+        if n is not None:
+            # Los índices de la muestra se generan por bloque para acotar la memoria.
+            i, j = _pares_sen(n[bloque], muestra)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pendientes = ((tomar(valores, bloque, j) - tomar(valores, bloque, i))
+                          / (tomar(tiempos, bloque, j) - tomar(tiempos, bloque, i)))
+        # Ordenamos (los NaN quedan al final) y tomamos el centro.
+        pendientes.sort(axis=1)
+        cantidad = (~np.isnan(pendientes)).sum(axis=1)
+        centro = np.stack([np.maximum(cantidad - 1, 0) // 2, cantidad // 2], axis=1)
+        centrales = np.take_along_axis(pendientes, centro, axis=1).mean(axis=1)
+        mediana[bloque] = np.where(cantidad > 0, centrales, np.nan)
+    return mediana
+
+
+def _pendiente_sen(valores, tiempos, n):
+    pendiente = np.full(valores.shape[0], np.nan)
+    # Cada estación usa todos sus pares o una muestra según su propio n, nunca según el
+    # ancho de la matriz (que depende de las otras estaciones de la llamada).
+    pares = n * (n - 1) // 2
+    exactas = np.flatnonzero((n >= 2) & (pares <= MAX_PARES_SEN))
+    muestreadas = np.flatnonzero(pares > MAX_PARES_SEN)
+    if len(exactas):
+        largo = n[exactas].max()
+        pendiente[exactas] = _medianas_pendientes(valores[exactas, :largo], tiempos[exactas, :largo])
+    if len(muestreadas):
+        pendiente[muestreadas] = _medianas_pendientes(valores[muestreadas], tiempos[muestreadas], n[muestreadas])
+    return pendiente
+
+
+def pendiente_sen(series, tiempos=None):
+
+    """
+    Pendiente de Sen: mediana de las pendientes entre todos los pares de datos. Si la serie
+    tiene más de MAX_PARES_SEN pares, se usa la mediana de una muestra fija de pares.
+    Parámetros:
+        series: array 2D estaciones x tiempo o lista de arrays 1D.
+        tiempos: tiempos (por ejemplo años) de cada dato; por defecto 0, 1, 2, ...
+    Retorna:
+        array con la pendiente de cada estación (unidades de la serie por unidad de tiempo).
+    """
+    valores, tiempos, n = _empaquetar(series, tiempos)
+    return _pendiente_sen(valores, tiempos, n)
+
+
+#>>>>>> MANN-KENDALL <<<<<<
+
+def _mann_kendall(valores, tiempos, n, alfa, corregir_autocorrelacion, metodo):
+    rangos, empates = _rangos_medios(valores, n)
+    if metodo == "auto":
+        metodo = "pares" if valores.shape[1] <= LARGO_PARES else "rangos"
+    s = _s_pares(valores) if metodo == "pares" else _s_rangos(rangos, n)
+
+    nf = n.astype(float)
+    varianza = (nf * (nf - 1) * (2 * nf + 5) - empates) / 18
+    pendiente = _pendiente_sen(valores, tiempos, n)
+    if corregir_autocorrelacion:
+        varianza = varianza * _factor_autocorrelacion(valores, tiempos, n, pendiente, alfa)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(varianza > 0, (s - np.sign(s)) / np.sqrt(varianza), 0.0)
+    p = 2 * (1 - np.vectorize(_normal.cdf, otypes=[float])(np.abs(z)))
+    tendencia = np.where(p < alfa, np.sign(s), 0).astype(int)
+
+    insuficientes = n < 3
+    for resultado in (varianza, z, p, pendiente):
+        resultado[insuficientes] = np.nan
+    tendencia[insuficientes] = 0
+    return {"n": n, "s": s, "varianza_s": varianza, "z": z, "p": p,
+            "tendencia": tendencia, "pendiente_sen": pendiente}
+
+
+def mann_kendall(series, tiempos=None, alfa=0.05, corregir_autocorrelacion=True, metodo="auto"):
+
+    """
+    Prueba de Mann-Kendall para varias estaciones a la vez.
+    Parámetros:
+        series: array 2D estaciones x tiempo o lista de arrays 1D (NaN o máscara = faltante).
+        tiempos: tiempos de cada dato, usados para la pendiente de Sen.
+        alfa (float): nivel de significación.
+        corregir_autocorrelacion (bool): aplica la corrección de Hamed y Rao a la varianza de S.
+        metodo (str): "pares", "rangos" o "auto" (pares en series cortas, rangos en largas).
+    Retorna:
+        dict de arrays (uno por estación): n, s, varianza_s, z, p, pendiente_sen y
+        tendencia (1 creciente, -1 decreciente, 0 sin tendencia significativa).
+    """
+    valores, tiempos, n = _empaquetar(series, tiempos)
+    return _mann_kendall(valores, tiempos, n, alfa, corregir_autocorrelacion, metodo)
+
+
+#>>>>>> PETTITT <<<<<<
+
+def _pettitt(valores, tiempos, n):
+    rangos, _ = _rangos_medios(valores, n)
+    # sum_j sign(x_t - x_j) = 2 R_t - (n + 1) con rangos medios, así U_t es una suma acumulada.
+    v = np.nan_to_num(2 * rangos - (n[:, None] + 1))
+    u = np.cumsum(v, axis=1)
+    indice = np.argmax(np.abs(u), axis=1)
+    k = np.abs(np.take_along_axis(u, indice[:, None], axis=1))[:, 0]
+    nf = n.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        p = np.minimum(2 * np.exp(-6 * k ** 2 / (nf ** 3 + nf ** 2)), 1)
+    cambio = np.take_along_axis(tiempos, indice[:, None], axis=1)[:, 0]
+
+    insuficientes = n < 3
+    p[insuficientes] = np.nan
+    cambio[insuficientes] = np.nan
+    return {"k": k, "p": p, "cambio": cambio}
+
+
+def pettitt(series, tiempos=None):
+
+    """
+    Prueba de Pettitt para un único punto de cambio.
+    Parámetros:
+        series: array 2D estaciones x tiempo o lista de arrays 1D.
+        tiempos: tiempos de cada dato; por defecto 0, 1, 2, ...
+    Retorna:
+        dict de arrays (uno por estación): k (estadístico), p (valor p aproximado) y
+        cambio (tiempo del último dato antes del cambio).
+    """
+    valores, tiempos, n = _empaquetar(series, tiempos)
+    return _pettitt(valores, tiempos, n)
+
+
+#----------------------------------
+#     ANÁLISIS DE LA RED
+#----------------------------------
+
+def _analizar_bloque(valores, tiempos, n, alfa, corregir_autocorrelacion, metodo):
+    resultado = _mann_kendall(valores, tiempos, n, alfa, corregir_autocorrelacion, metodo)
+    for clave, valor in _pettitt(valores, tiempos, n).items():
+        resultado[f"pettitt_{clave}"] = valor
+    return resultado
+
+
+def analizar_tendencias(series, tiempos=None, alfa=0.05, corregir_autocorrelacion=True,
+                        metodo="auto", trabajadores=1):
+
+    """
+    Mann-Kendall, pendiente de Sen y Pettitt para todas las estaciones.
+    Con trabajadores > 1 las estaciones se reparten en bloques entre procesos; dentro de
+    cada bloque el cálculo sigue vectorizado.
+    Retorna:
+        dict de arrays (uno por estación) con los resultados de mann_kendall y las claves
+        pettitt_k, pettitt_p y pettitt_cambio.
+    """
+    valores, tiempos, n = _empaquetar(series, tiempos)
+    if trabajadores <= 1 or len(n) < 2 * trabajadores:
+        return _analizar_bloque(valores, tiempos, n, alfa, corregir_autocorrelacion, metodo)
+
+    bloques = np.array_split(np.arange(len(n)), trabajadores)
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        partes = list(pool.map(_analizar_bloque,
+                               [valores[b] for b in bloques], [tiempos[b] for b in bloques],
+                               [n[b] for b in bloques], [alfa] * len(bloques),
+                               [corregir_autocorrelacion] * len(bloques), [metodo] * len(bloques)))
+    return {clave: np.concatenate([parte[clave] for parte in partes]) for clave in partes[0]}
+
+
+def tendencias_estacion(fechas_array, caudales, alfa=0.05, corregir_autocorrelacion=True):
+
+    """
+    Tendencias de una estación sobre sus caudales medios anuales y mensuales.
+    Parámetros:
+        fechas_array: array de fechas (datetime.date).
+        caudales: masked array de caudales.
+    Retorna:
+        dict con "anual" (resultados como escalares) y "mensual" (arrays de 12 valores,
+        uno por mes, enero primero).
+    """
+    anios, medias = agregados_anuales(fechas_array, caudales)
+    anual = analizar_tendencias([medias], anios, alfa, corregir_autocorrelacion)
+    anios, mensuales = agregados_mensuales(fechas_array, caudales)
+    mensual = analizar_tendencias(mensuales.T, anios, alfa, corregir_autocorrelacion)
+    return {"anios": anios, "medias_anuales": medias,
+            "anual": {clave: valor[0] for clave, valor in anual.items()},
+            "mensual": mensual}
+
+
+#----------------------------------
+#     BENCHMARK DE RENDIMIENTO
+#----------------------------------
+
+def benchmark_tendencias(estaciones=500, anios=100, trabajadores=4, semilla=0):
+
+    """
+    Mide el tiempo de analizar_tendencias sobre una red sintética de `estaciones` series
+    anuales de `anios` años (5 % de faltantes), con un proceso y con `trabajadores`, y compara
+    los dos métodos de cálculo de S en series mensuales de la misma red. También mide el
+    análisis completo (S, pendiente de Sen, autocorrelación y Pettitt) de las series mensuales.
+    Retorna:
+        dict con los tiempos en segundos.
+    """
+    generador = np.random.default_rng(semilla)
+    tendencia = generador.normal(0, 0.5, (estaciones, 1)) * np.arange(anios)
+    series = 100 + tendencia + generador.normal(0, 20, (estaciones, anios))
+    series[generador.random(series.shape) < 0.05] = np.nan
+    anios_serie = np.arange(1925, 1925 + anios)
+
+    resultado = {"estaciones": estaciones, "anios": anios}
+    inicio = time.perf_counter()
+    analizar_tendencias(series, anios_serie)
+    resultado["anual_un_proceso_s"] = round(time.perf_counter() - inicio, 3)
+
+    inicio = time.perf_counter()
+    analizar_tendencias(series, anios_serie, trabajadores=trabajadores)
+    resultado[f"anual_{trabajadores}_procesos_s"] = round(time.perf_counter() - inicio, 3)
+
+    mensuales = np.repeat(series, 12, axis=1) + generador.normal(0, 5, (estaciones, anios * 12))
+    inicio = time.perf_counter()
+    analizar_tendencias(mensuales)
+    resultado["mensual_completo_s"] = round(time.perf_counter() - inicio, 3)
+
+    valores, _, n = _empaquetar(mensuales)
+    rangos, _ = _rangos_medios(valores, n)
+    for metodo, funcion in (("pares", lambda: _s_pares(valores)), ("rangos", lambda: _s_rangos(rangos, n))):
+        inicio = time.perf_counter()
+        funcion()
+        resultado[f"s_mensual_{metodo}_s"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+if __name__ == "__main__":
+    print(benchmark_tendencias())